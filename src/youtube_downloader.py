@@ -1,13 +1,305 @@
+import argparse
+import atexit
+import json
 import os
+import queue
+import shelve
+import shutil
+import socket
+import subprocess
 import sys
+import tempfile
 import threading
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-from pytube import YouTube
-from pytube.exceptions import RegexMatchError, VideoUnavailable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
 
+# Sufixo dos arquivos e pastas temporários criados por este programa
+_SUFIXO_PARCIAL = ".ytdl.part"
 
-def baixar_video(url, pasta_destino=None, resolucao=None, apenas_audio=False, callback=None):
+# Pool HTTP único para todo o processo, criado junto com a configuração do pytube
+_HTTP_POOL = None
+_urllib3_exceptions = None
+_pytube_configurado = False
+_pytube_lock = threading.Lock()
+
+# Cache em disco dos metadados dos vídeos (título, duração e resoluções)
+_CAMINHO_CACHE_METADADOS = os.path.expanduser("~/.yt_dl_meta")
+_VALIDADE_CACHE_METADADOS = 3600  # 1 hora
+_cache_metadados_lock = threading.Lock()
+
+# Validade dos objetos YouTube guardados pela interface: as URLs assinadas dos streams expiram
+_VALIDADE_CACHE_YOUTUBE = 1800  # 30 minutos
+
+
+def _executar_requisicao_pool(url, method=None, headers=None, data=None,
+                              timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+    """
+    Substitui pytube.request._execute_request, reutilizando conexões do pool do urllib3.
+
+    Mantém o contrato do urlopen usado pelo pytube: a resposta expõe read() e info(),
+    erros HTTP geram HTTPError e falhas de conexão geram URLError.
+    """
+    base_headers = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+    if headers:
+        base_headers.update(headers)
+    if data and not isinstance(data, bytes):
+        data = bytes(json.dumps(data), encoding="utf-8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+
+    method = method or ("POST" if data else "GET")
+    kwargs = {}
+    if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+        kwargs["timeout"] = timeout
+    try:
+        # Respostas HEAD não têm corpo: carregá-las devolve a conexão ao pool na hora.
+        # As respostas GET ficam em streaming; a consulta de tamanho feita por
+        # request.stream (range=0-99999999999) só usa info() e nunca é lida, então
+        # sua conexão só é liberada quando a resposta é coletada (ler o corpo
+        # baixaria o arquivo inteiro)
+        resposta = _HTTP_POOL.request(
+            method, url, headers=base_headers, body=data,
+            preload_content=(method == "HEAD"), **kwargs
+        )
+    except _urllib3_exceptions.HTTPError as e:
+        motivo = getattr(e, "reason", None) or e
+        if isinstance(motivo, _urllib3_exceptions.TimeoutError):
+            raise URLError(socket.timeout(str(motivo))) from e
+        raise URLError(motivo) from e
+
+    if resposta.status >= 400:
+        resposta.release_conn()
+        raise HTTPError(url, resposta.status, resposta.reason, resposta.headers, None)
+    return resposta
+
+
+def _carregar_pytube():
+    """
+    Importa o pytube na primeira utilização e aplica os ajustes de rede.
+
+    O pytube e o urllib3 são importados apenas quando um vídeo é de fato
+    acessado, para que o modo linha de comando inicie rapidamente.
+
+    Returns:
+        module: O módulo pytube.request já configurado
+    """
+    global _HTTP_POOL, _urllib3_exceptions, _pytube_configurado
+    from pytube import request as pt_request
+
+    with _pytube_lock:
+        if _pytube_configurado:
+            return pt_request
+
+        # Faixas maiores reduzem o número de requisições HTTP por download (padrão do pytube: 9MiB)
+        pt_request.default_range_size = 10 * 1024 * 1024  # 10MiB
+
+        try:
+            import urllib3
+        except ImportError:
+            urllib3 = None
+
+        if urllib3 is not None:
+            # Pool único para todo o processo: downloads seguidos reaproveitam as conexões abertas
+            _HTTP_POOL = urllib3.PoolManager(
+                num_pools=4,
+                maxsize=20,
+                block=False,
+                retries=urllib3.Retry(total=3, backoff_factor=0.5),
+                # O pytube não define timeout: sem ele, uma conexão parada bloquearia a thread para sempre
+                timeout=urllib3.Timeout(connect=10, read=30)
+            )
+            _urllib3_exceptions = urllib3.exceptions
+            atexit.register(_HTTP_POOL.clear)
+            pt_request._execute_request = _executar_requisicao_pool
+
+        _pytube_configurado = True
+    return pt_request
+
+
+class _DownloadCancelado(Exception):
+    """Interrompe um download cujo evento de cancelamento foi sinalizado"""
+
+
+def _verificar_cancelamento(cancelado):
+    """Lança _DownloadCancelado se o evento de cancelamento foi sinalizado"""
+    if cancelado is not None and cancelado.is_set():
+        raise _DownloadCancelado()
+
+
+def _criar_on_progress(callback, progresso, *streams, cancelado=None):
+    """
+    Cria o callback de progresso do pytube, limitando a frequência das mensagens.
+
+    Quando mais de um stream é baixado ao mesmo tempo, a porcentagem informada
+    é a soma do progresso de todos eles. A porcentagem numérica também é
+    enviada para a função progresso, se fornecida. Se o evento cancelado for
+    sinalizado, o download é interrompido no próximo bloco recebido.
+    """
+    tamanho_total = sum(s.filesize for s in streams)
+    bytes_restantes = {s.itag: s.filesize for s in streams}
+    ultima_emissao = [0.0]
+    ultima_porcentagem = [-1.0]
+
+    def on_progress(stream, chunk, bytes_remaining):
+        _verificar_cancelamento(cancelado)
+        bytes_restantes[stream.itag] = bytes_remaining
+        restante = sum(bytes_restantes.values())
+        porcentagem = (tamanho_total - restante) / tamanho_total * 100
+        agora = time.monotonic()
+        # Emitir no máximo a cada 100ms ou 1%, sempre incluindo o fim do download
+        if (agora - ultima_emissao[0] > 0.1
+                or porcentagem - ultima_porcentagem[0] >= 1.0
+                or restante <= 0):
+            ultima_emissao[0] = agora
+            ultima_porcentagem[0] = porcentagem
+            if callback:
+                callback(f"Baixado: {porcentagem:.1f}%")
+            if progresso:
+                progresso(porcentagem)
+
+    return on_progress
+
+
+def _ultima_modificacao(entrada):
+    """Retorna a modificação mais recente da entrada, considerando os arquivos de uma pasta"""
+    modificacao = entrada.stat().st_mtime
+    if entrada.is_dir():
+        # A pasta só muda ao criar arquivos; as faixas em gravação mudam a cada chunk
+        for arquivo in os.scandir(entrada.path):
+            modificacao = max(modificacao, arquivo.stat().st_mtime)
+    return modificacao
+
+
+def _limpar_parciais(pasta, idade_minima=3600):
+    """Remove arquivos e pastas temporários deste programa abandonados por downloads interrompidos"""
+    limite = time.time() - idade_minima
+    for entrada in os.scandir(pasta):
+        # Apenas o sufixo próprio: outros programas (ex: navegadores) também usam .part
+        if not entrada.name.endswith(_SUFIXO_PARCIAL):
+            continue
+        try:
+            if _ultima_modificacao(entrada) >= limite:
+                continue
+            if entrada.is_dir():
+                shutil.rmtree(entrada.path)
+            else:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+
+def _finalizar_parcial(parcial, destino):
+    """Grava o arquivo parcial no disco e o move atomicamente para o destino"""
+    with open(parcial, "rb+") as fh:
+        os.fsync(fh.fileno())
+    os.replace(parcial, destino)
+    return destino
+
+
+def _remover_parcial(parcial):
+    """Remove o arquivo parcial de um download que falhou"""
+    try:
+        os.remove(parcial)
+    except OSError:
+        pass
+
+
+def _baixar_stream(stream, destino):
+    """Baixa o stream para um arquivo .part e o renomeia para o destino ao concluir"""
+    parcial = destino + _SUFIXO_PARCIAL
+    try:
+        stream.download(
+            output_path=os.path.dirname(destino),
+            filename=os.path.basename(parcial),
+            skip_existing=False
+        )
+        return _finalizar_parcial(parcial, destino)
+    except BaseException:
+        _remover_parcial(parcial)
+        raise
+
+
+def _transferir_stream(stream, fh):
+    """Envia o conteúdo do stream para fh com o mesmo laço de Stream.download"""
+    pt_request = _carregar_pytube()
+    bytes_restantes = stream.filesize
+    try:
+        for chunk in pt_request.stream(stream.url):
+            bytes_restantes -= len(chunk)
+            # on_progress grava o chunk em fh e notifica o callback
+            stream.on_progress(chunk, fh, bytes_restantes)
+    except HTTPError as e:
+        if e.code != 404:
+            raise
+        # Alguns streams adaptativos precisam ser requisitados em sequência
+        for chunk in pt_request.seq_stream(stream.url):
+            bytes_restantes -= len(chunk)
+            stream.on_progress(chunk, fh, bytes_restantes)
+
+
+def _converter_para_mp3(stream, destino):
+    """Envia o stream de áudio diretamente ao ffmpeg, convertendo para MP3 durante o download"""
+    parcial = destino + _SUFIXO_PARCIAL
+    processo = subprocess.Popen(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", "pipe:0",
+         "-vn", "-c:a", "libmp3lame", "-q:a", "2", "-f", "mp3", parcial],
+        stdin=subprocess.PIPE
+    )
+    pipe_fechado = False
+    try:
+        try:
+            _transferir_stream(stream, processo.stdin)
+        except BrokenPipeError:
+            # O ffmpeg encerrou antes do fim do download; o código de saída indica o motivo
+            pipe_fechado = True
+        finally:
+            try:
+                processo.stdin.close()
+            except BrokenPipeError:
+                pipe_fechado = True
+            codigo = processo.wait()
+        if codigo != 0:
+            raise RuntimeError(f"ffmpeg terminou com código {codigo}")
+        if pipe_fechado:
+            raise RuntimeError("ffmpeg encerrou antes do fim do download")
+        return _finalizar_parcial(parcial, destino)
+    except BaseException:
+        _remover_parcial(parcial)
+        raise
+
+
+def _baixar_adaptativo(video, audio, destino, cancelado=None):
+    """Baixa as faixas de vídeo e áudio em paralelo e as junta com o ffmpeg, sem recodificar"""
+    pasta_temporaria = tempfile.mkdtemp(suffix=_SUFIXO_PARCIAL, dir=os.path.dirname(destino))
+    parcial = destino + _SUFIXO_PARCIAL
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futuro_video = executor.submit(
+                video.download, output_path=pasta_temporaria, filename="video.mp4", skip_existing=False
+            )
+            futuro_audio = executor.submit(
+                audio.download, output_path=pasta_temporaria, filename="audio.mp4", skip_existing=False
+            )
+            caminho_video = futuro_video.result()
+            caminho_audio = futuro_audio.result()
+
+        _verificar_cancelamento(cancelado)
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", caminho_video, "-i", caminho_audio,
+             "-map", "0:v:0", "-map", "1:a:0", "-c", "copy", "-f", "mp4", parcial],
+            check=True
+        )
+        return _finalizar_parcial(parcial, destino)
+    except BaseException:
+        _remover_parcial(parcial)
+        raise
+    finally:
+        shutil.rmtree(pasta_temporaria, ignore_errors=True)
+
+
+def baixar_video(url, pasta_destino=None, resolucao=None, apenas_audio=False, callback=None, yt=None,
+                 adaptativo=False, progresso=None, cancelado=None):
     """
     Baixa um vídeo do YouTube.
 
@@ -19,15 +311,35 @@ def baixar_video(url, pasta_destino=None, resolucao=None, apenas_audio=False, ca
                                   Se não for fornecida, será baixada a maior resolução disponível.
         apenas_audio (bool, opcional): Se True, baixa apenas o áudio do vídeo.
         callback (function, opcional): Função para receber atualizações de status.
+        yt (YouTube, opcional): Objeto YouTube já criado para a URL, evitando
+                                uma nova busca das informações do vídeo.
+        adaptativo (bool, opcional): Se True, baixa vídeo e áudio separados (permitindo
+                                     resoluções acima de 720p) e os junta com o ffmpeg.
+        progresso (function, opcional): Função que recebe a porcentagem baixada (0 a 100).
+        cancelado (threading.Event, opcional): Evento que, quando sinalizado, interrompe
+                                               o download e remove os arquivos parciais.
 
     Returns:
         str: Caminho para o arquivo baixado
     """
+    try:
+        _carregar_pytube()
+        from pytube import YouTube
+        from pytube.exceptions import RegexMatchError, VideoUnavailable
+    except Exception as e:
+        if callback:
+            callback(f"Erro ao carregar o pytube: {str(e)}")
+        return None
+
     try:
         # Criar objeto YouTube
         if callback:
             callback("Conectando ao YouTube...")
-        yt = YouTube(url)
+        if yt is None:
+            yt = YouTube(url)
+
+        # Cada etapa de rede a seguir começa verificando se o download foi cancelado
+        _verificar_cancelamento(cancelado)
 
         # Informações sobre o vídeo
         info = f"Título: {yt.title}\n"
@@ -41,69 +353,106 @@ def baixar_video(url, pasta_destino=None, resolucao=None, apenas_audio=False, ca
         if pasta_destino is None:
             pasta_destino = os.getcwd()
         os.makedirs(pasta_destino, exist_ok=True)
+        _limpar_parciais(pasta_destino)
+        _verificar_cancelamento(cancelado)
 
         # Baixar apenas áudio
         if apenas_audio:
+            if shutil.which("ffmpeg") is None:
+                if callback:
+                    callback("Erro: ffmpeg não encontrado. Instale o ffmpeg para baixar em MP3.")
+                return None
+
             if callback:
                 callback("Baixando apenas áudio...")
-            audio = yt.streams.filter(only_audio=True).first()
+            audio = yt.streams.filter(only_audio=True).order_by("abr").desc().first()
 
-            def on_progress(stream, chunk, bytes_remaining):
-                tamanho_total = stream.filesize
-                bytes_baixados = tamanho_total - bytes_remaining
-                porcentagem = bytes_baixados / tamanho_total * 100
-                if callback:
-                    callback(f"Baixado: {porcentagem:.1f}%")
+            _verificar_cancelamento(cancelado)
+            yt.register_on_progress_callback(_criar_on_progress(callback, progresso, audio, cancelado=cancelado))
 
-            yt.register_on_progress_callback(on_progress)
-            arquivo_baixado = audio.download(output_path=pasta_destino)
-
-            # Converter para mp3
-            base, _ = os.path.splitext(arquivo_baixado)
-            novo_arquivo = base + '.mp3'
-            os.rename(arquivo_baixado, novo_arquivo)
+            # Converter para mp3 enquanto baixa, sem arquivo intermediário
+            base, _ = os.path.splitext(audio.get_file_path(output_path=pasta_destino))
+            novo_arquivo = _converter_para_mp3(audio, base + '.mp3')
 
             if callback:
                 callback(f"Áudio baixado e salvo como {os.path.basename(novo_arquivo)}")
             return novo_arquivo
 
+        # Baixar vídeo e áudio separados
+        elif adaptativo:
+            if shutil.which("ffmpeg") is None:
+                if callback:
+                    callback("Erro: ffmpeg não encontrado. Instale o ffmpeg para baixar em alta resolução.")
+                return None
+
+            videos = yt.streams.filter(adaptive=True, only_video=True, file_extension="mp4")
+            video = None
+            if resolucao:
+                video = videos.filter(resolution=resolucao).first()
+                if not video and callback:
+                    callback(f"Resolução {resolucao} não disponível. Usando a melhor resolução disponível.")
+            if not video:
+                video = videos.order_by("resolution").desc().first()
+            audio = yt.streams.filter(only_audio=True, file_extension="mp4").order_by("abr").desc().first()
+            if not video or not audio:
+                if callback:
+                    callback("Erro: este vídeo não possui faixas MP4 separadas de vídeo e áudio. "
+                             "Tente sem a opção de alta resolução.")
+                return None
+
+            if callback:
+                callback(f"Baixando vídeo com resolução {video.resolution} e áudio {audio.abr}...")
+
+            _verificar_cancelamento(cancelado)
+            yt.register_on_progress_callback(_criar_on_progress(callback, progresso, video, audio, cancelado=cancelado))
+            arquivo_baixado = _baixar_adaptativo(
+                video, audio, video.get_file_path(output_path=pasta_destino), cancelado
+            )
+
+            if callback:
+                callback(f"Vídeo baixado e salvo como {os.path.basename(arquivo_baixado)}")
+            return arquivo_baixado
+
         # Baixar vídeo
         else:
-            resolucoes_disponiveis = []
-            for stream in yt.streams.filter(progressive=True):
-                resolucoes_disponiveis.append(stream.resolution)
+            # Percorrer os streams progressivos uma única vez
+            progressivos = [s for s in yt.streams.filter(progressive=True) if s.resolution]
+            if not progressivos:
+                if callback:
+                    callback("Erro: este vídeo não possui streams com vídeo e áudio juntos. "
+                             "Tente com a opção de alta resolução.")
+                return None
+            resolucoes_disponiveis = [s.resolution for s in progressivos]
+            # Altura numérica de cada stream ("720p" -> 720), calculada uma única vez
+            alturas = {s.itag: int(s.resolution.rstrip("p")) for s in progressivos}
 
             if callback:
                 callback(f"Resoluções disponíveis: {', '.join(resolucoes_disponiveis)}")
 
+            stream = None
             if resolucao:
                 # Baixar com resolução específica
-                stream = yt.streams.filter(progressive=True, resolution=resolucao).first()
-                if not stream:
-                    if callback:
-                        callback(f"Resolução {resolucao} não disponível. Usando a melhor resolução disponível.")
-                    stream = yt.streams.get_highest_resolution()
-            else:
+                stream = next((s for s in progressivos if s.resolution == resolucao), None)
+                if not stream and callback:
+                    callback(f"Resolução {resolucao} não disponível. Usando a melhor resolução disponível.")
+            if not stream:
                 # Baixar com a melhor resolução disponível
-                stream = yt.streams.get_highest_resolution()
+                stream = max(progressivos, key=lambda s: alturas[s.itag])
 
             if callback:
                 callback(f"Baixando vídeo com resolução {stream.resolution}...")
 
-            def on_progress(stream, chunk, bytes_remaining):
-                tamanho_total = stream.filesize
-                bytes_baixados = tamanho_total - bytes_remaining
-                porcentagem = bytes_baixados / tamanho_total * 100
-                if callback:
-                    callback(f"Baixado: {porcentagem:.1f}%")
-
-            yt.register_on_progress_callback(on_progress)
-            arquivo_baixado = stream.download(output_path=pasta_destino)
+            _verificar_cancelamento(cancelado)
+            yt.register_on_progress_callback(_criar_on_progress(callback, progresso, stream, cancelado=cancelado))
+            arquivo_baixado = _baixar_stream(stream, stream.get_file_path(output_path=pasta_destino))
 
             if callback:
                 callback(f"Vídeo baixado e salvo como {os.path.basename(arquivo_baixado)}")
             return arquivo_baixado
 
+    except _DownloadCancelado:
+        if callback:
+            callback("Download cancelado.")
     except RegexMatchError:
         if callback:
             callback("Erro: URL inválida. Verifique se a URL está correta.")
@@ -115,21 +464,79 @@ def baixar_video(url, pasta_destino=None, resolucao=None, apenas_audio=False, ca
             callback(f"Erro inesperado: {str(e)}")
 
 
-def obter_resolucoes(url, callback=None):
-    """Obtém as resoluções disponíveis para um vídeo"""
+def _ler_cache_metadados(video_id):
+    """Retorna os metadados do vídeo salvos em disco, ou None se ausentes ou expirados"""
+    try:
+        with _cache_metadados_lock, shelve.open(_CAMINHO_CACHE_METADADOS) as cache:
+            metadados = cache.get(video_id)
+    except Exception:
+        return None
+    if metadados and time.time() - metadados["ts"] < _VALIDADE_CACHE_METADADOS:
+        return metadados
+    return None
+
+
+def _salvar_cache_metadados(video_id, titulo, duracao, resolucoes, resolucoes_adaptativas):
+    """Salva os metadados do vídeo em disco (as URLs dos streams expiram e não são salvas)"""
+    try:
+        with _cache_metadados_lock, shelve.open(_CAMINHO_CACHE_METADADOS) as cache:
+            agora = time.time()
+            # Descartar as entradas expiradas para que o arquivo não cresça a cada vídeo verificado
+            expiradas = [
+                chave for chave, metadados in cache.items()
+                if agora - metadados["ts"] >= _VALIDADE_CACHE_METADADOS
+            ]
+            for chave in expiradas:
+                del cache[chave]
+            cache[video_id] = {
+                "ts": agora,
+                "titulo": titulo,
+                "duracao": duracao,
+                "resolucoes": resolucoes,
+                "resolucoes_adaptativas": resolucoes_adaptativas,
+            }
+    except Exception:
+        pass
+
+
+def _ordenar_resolucoes(streams):
+    """Retorna as resoluções dos streams sem repetição, da maior para a menor"""
+    return sorted(
+        {s.resolution for s in streams if s.resolution},
+        key=lambda r: int(r.rstrip("p")),
+        reverse=True
+    )
+
+
+def obter_resolucoes(url, callback=None, yt=None, adaptativo=False):
+    """Obtém as resoluções disponíveis para um vídeo (das faixas separadas, se adaptativo=True)"""
+    chave = "resolucoes_adaptativas" if adaptativo else "resolucoes"
     try:
         if callback:
             callback("Obtendo informações do vídeo...")
-        yt = YouTube(url)
-        resolucoes = []
-        streams = yt.streams.filter(progressive=True)
-        for stream in streams:
-            resolucoes.append(stream.resolution)
+        _carregar_pytube()
+        from pytube import YouTube, extract
+
+        # Usar os metadados em cache de uma verificação recente, sem acessar o YouTube
+        video_id = yt.video_id if yt is not None else extract.video_id(url)
+        metadados = _ler_cache_metadados(video_id)
+        if metadados and chave in metadados:
+            if callback:
+                callback(f"Título do vídeo: {metadados['titulo']}")
+            return metadados[chave]
+
+        if yt is None:
+            yt = YouTube(url)
+        resolucoes = _ordenar_resolucoes(yt.streams.filter(progressive=True))
+        resolucoes_adaptativas = _ordenar_resolucoes(
+            yt.streams.filter(adaptive=True, only_video=True, file_extension="mp4")
+        )
 
         if callback:
             callback(f"Título do vídeo: {yt.title}")
 
-        return resolucoes
+        _salvar_cache_metadados(video_id, yt.title, yt.length, resolucoes, resolucoes_adaptativas)
+        return resolucoes_adaptativas if adaptativo else resolucoes
     except Exception as e:
         if callback:
             callback(f"Erro ao obter resoluções: {str(e)}")
@@ -138,11 +545,25 @@ def obter_resolucoes(url, callback=None):
 
 class YouTubeDownloaderGUI:
     def __init__(self, root):
+        import tkinter as tk
+        from tkinter import ttk, scrolledtext
+
         self.root = root
         self.root.title("YouTube Downloader")
         self.root.geometry("600x500")
         self.root.resizable(True, True)
 
+        # Objetos YouTube já verificados, indexados pela URL, com o momento da verificação
+        self._yt_cache = {}
+        # Resoluções do último vídeo verificado: {False: progressivas, True: adaptativas}
+        self._resolucoes_verificadas = {}
+
+        # Threads reutilizadas para verificações e downloads
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdl")
+        self._current_future = None
+        self._cancelado = threading.Event()
+        self.root.protocol("WM_DELETE_WINDOW", self._ao_fechar)
+
         # Estilo
         self.style = ttk.Style()
         self.style.configure("TFrame", background="#f0f0f0")
@@ -185,6 +606,16 @@ class YouTubeDownloaderGUI:
         )
         self.apenas_audio_check.pack(side=tk.LEFT, padx=(0, 15))
 
+        # Opção de alta resolução (vídeo e áudio separados)
+        self.adaptativo_var = tk.BooleanVar()
+        self.adaptativo_check = ttk.Checkbutton(
+            options_frame,
+            text="Alta Resolução (ffmpeg)",
+            variable=self.adaptativo_var,
+            command=self._atualizar_resolucoes
+        )
+        self.adaptativo_check.pack(side=tk.LEFT, padx=(0, 15))
+
         # Resolução
         resolucao_label = ttk.Label(options_frame, text="Resolução:")
         resolucao_label.pack(side=tk.LEFT, padx=(0, 5))
@@ -230,7 +661,8 @@ class YouTubeDownloaderGUI:
             main_frame,
             orient="horizontal",
             length=580,
-            mode="indeterminate",
+            mode="determinate",
+            maximum=100,
             variable=self.progresso_var
         )
         self.progresso_bar.pack(fill=tk.X, pady=5)
@@ -243,72 +675,165 @@ class YouTubeDownloaderGUI:
         self.log_text.pack(fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
 
+        # Mensagens de log produzidas pelas threads, consumidas na thread principal
+        self._log_queue = queue.Queue()
+        # Porcentagens de download produzidas pelas threads
+        self._progresso_queue = queue.Queue()
+        self.root.after(50, self._drain_log_queue)
+
     def add_log(self, mensagem):
-        """Adiciona mensagem ao log"""
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, mensagem + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        # Atualizar a interface
-        self.root.update_idletasks()
+        """Adiciona mensagem ao log (pode ser chamado de qualquer thread)"""
+        self._log_queue.put(mensagem)
+
+    def atualizar_progresso(self, porcentagem):
+        """Atualiza a barra de progresso (pode ser chamado de qualquer thread)"""
+        self._progresso_queue.put(porcentagem)
+
+    def _drain_log_queue(self):
+        """Escreve no log as mensagens pendentes na fila e atualiza a barra de progresso"""
+        mensagens = []
+        while True:
+            try:
+                mensagens.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Inserir todas as mensagens pendentes de uma só vez
+        if mensagens:
+            self.log_text.config(state="normal")
+            self.log_text.insert("end", "\n".join(mensagens) + "\n")
+            self.log_text.see("end")
+            self.log_text.config(state="disabled")
+
+        # Apenas a porcentagem mais recente interessa
+        porcentagem = None
+        while True:
+            try:
+                porcentagem = self._progresso_queue.get_nowait()
+            except queue.Empty:
+                break
+        if porcentagem is not None:
+            self.progresso_var.set(porcentagem)
+        self.root.after(50, self._drain_log_queue)
 
     def toggle_audio_mode(self):
         """Ativa/desativa o seletor de resolução baseado na opção de áudio"""
         if self.apenas_audio_var.get():
             self.resolucao_combo.config(state="disabled")
+            self.adaptativo_check.config(state="disabled")
         else:
             self.resolucao_combo.config(state="readonly")
+            self.adaptativo_check.config(state="normal")
+
+    def _atualizar_resolucoes(self):
+        """Preenche o seletor de resolução conforme a opção de alta resolução"""
+        resolucoes = self._resolucoes_verificadas.get(self.adaptativo_var.get())
+        if resolucoes is None:
+            return
+
+        # Adicionar "Melhor disponível" no início
+        resolucoes_com_melhor = ["Melhor disponível"] + resolucoes
+        self.resolucao_combo['values'] = resolucoes_com_melhor
+        if self.resolucao_var.get() not in resolucoes_com_melhor:
+            self.resolucao_var.set(resolucoes_com_melhor[0])
 
     def browse_folder(self):
         """Abre diálogo para selecionar pasta de destino"""
+        from tkinter import filedialog
+
         pasta = filedialog.askdirectory()
         if pasta:
             self.destino_var.set(pasta)
 
     def verificar_video(self):
         """Verifica o vídeo e obtém resoluções disponíveis"""
+        from tkinter import messagebox
+
         url = self.url_entry.get().strip()
         if not url:
             messagebox.showerror("Erro", "Por favor, insira uma URL válida")
             return
 
         # Desabilitar botões durante a verificação
-        self.verificar_btn.config(state=tk.DISABLED)
-        self.download_btn.config(state=tk.DISABLED)
-
-        # Iniciar progresso indeterminado
-        self.progresso_bar.start()
+        self.verificar_btn.config(state="disabled")
+        self.download_btn.config(state="disabled")
 
         self.add_log("Verificando vídeo...")
 
-        # Executar em thread separada
-        threading.Thread(
-            target=self._verificar_thread,
-            args=(url,),
-            daemon=True
-        ).start()
+        # Executar em uma thread do pool
+        self._current_future = self._pool.submit(self._verificar_thread, url)
 
     def _verificar_thread(self, url):
         """Thread para verificar o vídeo"""
-        resolucoes = obter_resolucoes(url, self.add_log)
-
-        # Atualizar interface na thread principal
-        self.root.after(0, lambda: self._atualizar_apos_verificacao(resolucoes))
+        resolucoes = {}
+        try:
+            resolucoes = self._verificar(url)
+        except Exception as e:
+            self.add_log(f"Erro inesperado: {str(e)}")
+        finally:
+            # Atualizar interface na thread principal, mesmo se a verificação falhar
+            if not self._cancelado.is_set():
+                self.root.after(0, lambda: self._atualizar_apos_verificacao(resolucoes))
+
+    def _verificar(self, url):
+        """
+        Obtém as resoluções do vídeo, guardando o objeto YouTube em cache.
+
+        Retorna um dicionário com as resoluções progressivas (chave False) e as das
+        faixas separadas (chave True), ou um dicionário vazio em caso de erro.
+        """
+        try:
+            _carregar_pytube()
+            from pytube import YouTube
+            from pytube.exceptions import RegexMatchError
+        except Exception as e:
+            self.add_log(f"Erro ao carregar o pytube: {str(e)}")
+            return {}
+
+        try:
+            yt = self._yt_em_cache(url) or YouTube(url)
+        except RegexMatchError:
+            self.add_log("Erro: URL inválida. Verifique se a URL está correta.")
+            return {}
+
+        # Cada consulta ao YouTube só começa se a janela ainda estiver aberta
+        if self._cancelado.is_set():
+            return {}
+        # Alguns vídeos só têm faixas separadas: as duas listas são obtidas sempre
+        progressivas = obter_resolucoes(url, self.add_log, yt)
+        if self._cancelado.is_set():
+            return {}
+        adaptativas = obter_resolucoes(url, yt=yt, adaptativo=True)
+        if not progressivas and not adaptativas:
+            return {}
+        self._yt_cache[url] = (time.monotonic(), yt)
+        return {False: progressivas, True: adaptativas}
+
+    def _yt_em_cache(self, url):
+        """Retorna o objeto YouTube em cache para a URL, descartando-o se estiver expirado"""
+        entrada = self._yt_cache.get(url)
+        if entrada is None:
+            return None
+        verificado_em, yt = entrada
+        if time.monotonic() - verificado_em >= _VALIDADE_CACHE_YOUTUBE:
+            self._yt_cache.pop(url, None)
+            return None
+        return yt
 
     def _atualizar_apos_verificacao(self, resolucoes):
         """Atualiza a interface após verificação do vídeo"""
-        self.progresso_bar.stop()
-        self.verificar_btn.config(state=tk.NORMAL)
-        self.download_btn.config(state=tk.NORMAL)
+        self.verificar_btn.config(state="normal")
+        self.download_btn.config(state="normal")
 
         if resolucoes:
-            # Adicionar "Melhor disponível" no início
-            resolucoes_com_melhor = ["Melhor disponível"] + resolucoes
-            self.resolucao_combo['values'] = resolucoes_com_melhor
+            self._resolucoes_verificadas = resolucoes
+            self._atualizar_resolucoes()
             self.add_log("Vídeo verificado com sucesso!")
 
     def iniciar_download(self):
         """Inicia o download do vídeo"""
+        from tkinter import messagebox
+
         url = self.url_entry.get().strip()
         if not url:
             messagebox.showerror("Erro", "Por favor, insira uma URL válida")
@@ -325,69 +850,106 @@ class YouTubeDownloaderGUI:
             resolucao = self.resolucao_var.get()
 
         # Desabilitar botões durante o download
-        self.verificar_btn.config(state=tk.DISABLED)
-        self.download_btn.config(state=tk.DISABLED)
+        self.verificar_btn.config(state="disabled")
+        self.download_btn.config(state="disabled")
 
-        # Iniciar progresso indeterminado
-        self.progresso_bar.start()
+        # Reiniciar a barra de progresso
+        self.progresso_var.set(0)
 
         self.add_log("Iniciando download...")
 
-        # Executar em thread separada
-        threading.Thread(
-            target=self._download_thread,
-            args=(url, pasta_destino, resolucao, self.apenas_audio_var.get()),
-            daemon=True
-        ).start()
+        # Executar em uma thread do pool
+        self._current_future = self._pool.submit(
+            self._download_thread,
+            url, pasta_destino, resolucao, self.apenas_audio_var.get(),
+            self.adaptativo_var.get() and not self.apenas_audio_var.get()
+        )
 
-    def _download_thread(self, url, pasta_destino, resolucao, apenas_audio):
+    def _download_thread(self, url, pasta_destino, resolucao, apenas_audio, adaptativo):
         """Thread para baixar o vídeo"""
-        baixar_video(url, pasta_destino, resolucao, apenas_audio, self.add_log)
+        sucesso = False
+        try:
+            # baixar_video retorna None quando o erro já foi informado pelo callback
+            sucesso = baixar_video(
+                url, pasta_destino, resolucao, apenas_audio, self.add_log,
+                yt=self._yt_em_cache(url), adaptativo=adaptativo, progresso=self.atualizar_progresso,
+                cancelado=self._cancelado
+            ) is not None
+        except Exception as e:
+            self.add_log(f"Erro inesperado: {str(e)}")
+        finally:
+            # O objeto é usado em um único download; o próximo busca URLs novas
+            self._yt_cache.pop(url, None)
+            # Atualizar interface na thread principal, mesmo se o download falhar
+            if not self._cancelado.is_set():
+                self.root.after(0, lambda: self._finalizar_download(sucesso))
+
+    def _finalizar_download(self, sucesso):
+        """Finaliza o processo de download"""
+        from tkinter import messagebox
 
-        # Atualizar interface na thread principal
-        self.root.after(0, self._finalizar_download)
+        self.verificar_btn.config(state="normal")
+        self.download_btn.config(state="normal")
+        if sucesso:
+            self.add_log("Download concluído!")
+            messagebox.showinfo("Sucesso", "Download concluído com sucesso!")
+        else:
+            messagebox.showerror("Erro", "O download falhou. Veja o log de atividades para mais detalhes.")
 
-    def _finalizar_download(self):
-        """Finaliza o processo de download"""
-        self.progresso_bar.stop()
-        self.verificar_btn.config(state=tk.NORMAL)
-        self.download_btn.config(state=tk.NORMAL)
-        self.add_log("Download concluído!")
-        messagebox.showinfo("Sucesso", "Download concluído com sucesso!")
+    def _ao_fechar(self):
+        """Cancela as tarefas pendentes e encerra o pool ao fechar a janela"""
+        self._cancelado.set()
+        if self._current_future is not None:
+            self._current_future.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 
 def iniciar_gui():
     """Inicia a interface gráfica"""
+    # Importado apenas aqui para que o modo linha de comando não carregue o Tk
+    import tkinter as tk
+
     root = tk.Tk()
     app = YouTubeDownloaderGUI(root)
+    # Ao sair, o interpretador aguarda a tarefa em andamento no pool. Fechar a janela a
+    # cancela na próxima etapa de rede ou bloco recebido, e o timeout do pool HTTP
+    # limita a espera por uma conexão parada
     root.mainloop()
 
 
+def criar_parser():
+    """Cria o parser de argumentos do modo linha de comando"""
+    parser = argparse.ArgumentParser(description="Baixa vídeos e áudios do YouTube.")
+    parser.add_argument("url", help="URL do vídeo do YouTube")
+    parser.add_argument("pasta", nargs="?", help="pasta onde o arquivo será salvo (padrão: pasta atual)")
+    parser.add_argument("--pasta", dest="pasta_opcao", metavar="PASTA", help="o mesmo que o argumento pasta")
+    parser.add_argument("--resolucao", help="resolução desejada (ex: 720p)")
+    parser.add_argument("--audio", action="store_true", help="baixa apenas o áudio em MP3")
+    parser.add_argument("--adaptativo", action="store_true",
+                        help="baixa vídeo e áudio separados e os junta com o ffmpeg")
+    return parser
+
+
 def main():
     """Função principal para executar a partir da linha de comando"""
 
     # Verificar argumentos para modo CLI ou GUI
-    if len(sys.argv) > 1 and sys.argv[1] != "--gui":
-        # Modo linha de comando
-        url = sys.argv[1]
-        pasta_destino = None
-        resolucao = None
-        apenas_audio = False
-
-        # Analisar argumentos opcionais
-        for i in range(2, len(sys.argv)):
-            if sys.argv[i] == "--audio":
-                apenas_audio = True
-            elif sys.argv[i] == "--resolucao" and i + 1 < len(sys.argv):
-                resolucao = sys.argv[i + 1]
-            elif not sys.argv[i].startswith("--") and pasta_destino is None:
-                pasta_destino = sys.argv[i]
-
-        baixar_video(url, pasta_destino, resolucao, apenas_audio)
-    else:
-        # Modo GUI
+    if len(sys.argv) == 1 or "--gui" in sys.argv:
         iniciar_gui()
+        return
+
+    # Modo linha de comando
+    # Permite a pasta depois das opções (ex: URL --audio PASTA), como no laço antigo
+    args = criar_parser().parse_intermixed_args()
+    arquivo = baixar_video(
+        args.url, args.pasta_opcao or args.pasta, args.resolucao, args.audio,
+        callback=print, adaptativo=args.adaptativo
+    )
+    # Os erros já foram exibidos pelo callback
+    if arquivo is None:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()